@@ -1,4 +1,5 @@
 from .client import HelyOSClient,  connect_rabbitmq
+from .async_client import HelyOSAsyncClient
 from .mqtt_client import HelyOSMQTTClient,  connect_mqtt
 
 from .connector import AgentConnector
@@ -0,0 +1,346 @@
+import os
+import time
+import random
+import threading
+import pika
+from .exceptions import *
+from .client import (HelyOSClient, connect_rabbitmq, _connection_parameters,
+                     AGENTS_UL_EXCHANGE, AGENTS_DL_EXCHANGE, AGENT_ANONYMOUS_EXCHANGE, PUBLISH_MAX_TRIES)
+
+ASYNC_HEARTBEAT = int(os.environ.get(
+    'ASYNC_HEARTBEAT', 60))
+IOLOOP_TIMEOUT = int(os.environ.get(
+    'IOLOOP_TIMEOUT', 30))
+
+
+class HelyOSAsyncClient(HelyOSClient):
+
+    def __init__(self, rabbitmq_host, rabbitmq_port=5672, uuid=None, enable_ssl=False, ca_certificate=None,
+                 helyos_public_key=None, agent_privkey=None, agent_pubkey=None, vhost='/', send_user_id=True):
+        """ HelyOS asynchronous client class
+
+            Same interface as HelyOSClient, but the AMQP connection is a `pika.SelectConnection` whose IO loop
+            runs in a dedicated daemon thread. Heartbeats are serviced by the IO loop independently of the
+            application threads, so a short heartbeat interval (env.ASYNC_HEARTBEAT, defaults to 60 s) can be used
+            to detect dead brokers. Publishing is scheduled in the IO loop and does not block the caller, and the
+            consumer callbacks run in the IO loop thread.
+
+            The check-in request-reply is performed over a temporary blocking connection.
+            DatabaseConnector and SummaryRPC require the blocking HelyOSClient.
+
+            .. code-block:: python
+
+                helyos_client = HelyOSAsyncClient(host='myrabbitmq.com', port=5672, uuid='3452345-52453-43525')
+                helyos_client.connect('my_username', 'secret_password')
+                helyos_client.perform_checkin(yard_uid='yard_A', status='free')
+                helyos_client.get_checkin_result()
+
+            The parameters are the same as in HelyOSClient.
+        """
+        super().__init__(rabbitmq_host, rabbitmq_port, uuid, enable_ssl, ca_certificate,
+                         helyos_public_key, agent_privkey, agent_pubkey, vhost, send_user_id)
+        self._ioloop_thread = None
+        self._ready = threading.Event()
+        self._stop_listening = threading.Event()
+        self._open_error = None
+        self._checkin_connection = None
+        self._delivery_tag = 0
+        self._pending_confirms = {}
+        self._reconnect_lock = threading.Lock()
+
+    @property
+    def is_connection_open(self):
+        """ Check if the connection is open """
+        return self.connection is not None and self.connection.is_open and self.channel is not None
+
+    # IO loop callbacks, they run in the IO loop thread.
+
+    def __on_connection_open(self, connection):
+        connection.channel(on_open_callback=self.__on_channel_open)
+
+    def __on_connection_open_error(self, connection, err):
+        self._open_error = err
+        connection.ioloop.stop()
+        self._ready.set()
+
+    def __on_connection_closed(self, connection, reason):
+        self.channel = None
+        self.__fail_pending_confirms()
+        connection.ioloop.stop()
+
+    def __on_channel_open(self, channel):
+        self.channel = channel
+        self._delivery_tag = 0
+        self._pending_confirms = {}
+        channel.add_on_close_callback(self.__on_channel_closed)
+        channel.confirm_delivery(self.__on_delivery_confirmation, callback=lambda frame: self._ready.set())
+
+    def __on_channel_closed(self, channel, reason):
+        # e.g. publishing to a missing exchange; the next publish reconnects.
+        print(f'Channel closed by the RabbitMQ server. {reason}')
+        if self.channel is channel:
+            self.channel = None
+        self.__fail_pending_confirms()
+
+    def __fail_pending_confirms(self):
+        for waiter in self._pending_confirms.values():
+            waiter[1] = False
+            waiter[0].set()
+        self._pending_confirms = {}
+
+    def __on_delivery_confirmation(self, frame):
+        method = frame.method
+        acked = isinstance(method, pika.spec.Basic.Ack)
+        if method.multiple:
+            tags = [tag for tag in self._pending_confirms if tag <= method.delivery_tag]
+        else:
+            tags = [method.delivery_tag]
+
+        for tag in tags:
+            waiter = self._pending_confirms.pop(tag, None)
+            if waiter is not None:
+                # waiter = [event, all acked, number of unconfirmed messages]
+                waiter[1] = waiter[1] and acked
+                waiter[2] -= 1
+                if waiter[2] == 0:
+                    waiter[0].set()
+
+    def __in_ioloop_thread(self):
+        return threading.current_thread() is self._ioloop_thread
+
+    def __call_in_ioloop(self, func):
+        """ Schedule func(done) in the IO loop and wait until it calls done(result). """
+        if self.__in_ioloop_thread():
+            raise RuntimeError('HelyOSAsyncClient cannot wait for the IO loop inside a consumer callback.')
+
+        event = threading.Event()
+        result = []
+
+        def done(value=None):
+            result.append(value)
+            event.set()
+
+        self.connection.ioloop.add_callback_threadsafe(lambda: func(done))
+        if not event.wait(IOLOOP_TIMEOUT):
+            raise HelyOSAccountConnectionError('Timeout waiting for the RabbitMQ server.')
+        return result[0]
+
+    def __stop_ioloop(self):
+        connection = self.connection
+        if connection is not None and connection.is_open:
+            connection.ioloop.add_callback_threadsafe(connection.close)
+        elif connection is not None:
+            connection.ioloop.add_callback_threadsafe(connection.ioloop.stop)
+        if self._ioloop_thread is not None and not self.__in_ioloop_thread():
+            self._ioloop_thread.join(IOLOOP_TIMEOUT)
+        self._ioloop_thread = None
+
+    def _open_connections(self, username, password):
+        self.__stop_ioloop()
+
+        params = _connection_parameters(self.rabbitmq_host, self.rabbitmq_port,
+                                        username, password,
+                                        self.enable_ssl, self.ca_certificate,
+                                        vhost=self.vhost, ca_certificate_digest=self._ca_certificate_digest)
+        params.heartbeat = ASYNC_HEARTBEAT
+
+        self._ready.clear()
+        self._open_error = None
+        self.channel = None
+        connection = pika.SelectConnection(params,
+                                           on_open_callback=self.__on_connection_open,
+                                           on_open_error_callback=self.__on_connection_open_error,
+                                           on_close_callback=self.__on_connection_closed)
+        self._ioloop_thread = threading.Thread(target=connection.ioloop.start, daemon=True)
+        self._ioloop_thread.start()
+
+        if not self._ready.wait(IOLOOP_TIMEOUT) or self._open_error is not None:
+            self.connection = connection
+            self.__stop_ioloop()
+            self.connection = None
+            raise HelyOSAccountConnectionError(f'Not able to open the IO loop connection. {self._open_error}')
+
+        self.connection = connection
+        self.rbmq_username = username
+        self.rbmq_password = password
+        self._publish_user_id = username if self.send_user_id else None
+
+    def __ensure_connection(self):
+        # It runs with _reconnect_lock held: only one thread reconnects, the others wait for the new connection.
+        for attempt in range(PUBLISH_MAX_TRIES):
+            if self.is_connection_open:
+                return
+
+            print(f"Connection error when publishing. Reconnecting... try {attempt}")
+            try:
+                self.reconnect()
+                return
+            except Exception as err:
+                print(err)
+                # Exponential backoff with jitter before the next attempt.
+                time.sleep(min(0.25 * 2**attempt, 4.0) + random.random() * 0.1)
+
+        raise HelyOSAccountConnectionError("Connection error when publishing.")
+
+    def __publish_in_ioloop(self, messages, confirm):
+        # waiter = [event, all acked, number of unconfirmed messages]
+        waiter = [threading.Event(), True, 0] if confirm else None
+        if confirm and self.__in_ioloop_thread():
+            raise RuntimeError('HelyOSAsyncClient cannot wait for publisher confirms inside a consumer callback.')
+
+        def publish_all():
+            # An exception raised here would stop the IO loop thread, therefore it is only reported.
+            try:
+                for exchange, routing_key, headers, body in messages:
+                    self.channel.basic_publish(exchange, routing_key, body, properties=headers)
+                    self._delivery_tag += 1
+                    if waiter is not None:
+                        waiter[2] += 1
+                        self._pending_confirms[self._delivery_tag] = waiter
+                if waiter is not None and waiter[2] == 0:
+                    waiter[0].set()
+            except Exception as err:
+                print(f'Error when publishing. {err}')
+                if waiter is not None:
+                    waiter[1] = False
+                    waiter[0].set()
+
+        # The messages are scheduled while holding the lock, so they cannot land on a connection being replaced.
+        with self._reconnect_lock:
+            if self.connection is None:
+                raise HelyOSAccountConnectionError('The connection was closed by close_connection().')
+            self.__ensure_connection()
+            self.connection.ioloop.add_callback_threadsafe(publish_all)
+        if waiter is not None:
+            if not waiter[0].wait(IOLOOP_TIMEOUT) or not waiter[1]:
+                raise HelyOSAccountConnectionError('Message was not confirmed by the RabbitMQ server.')
+
+    @HelyOSClient.auth_required
+    def publish(self, routing_key, message, signed=False, reply_to=None, corr_id=None, exchange=AGENTS_UL_EXCHANGE, confirm=False):
+        """ Publish message in RabbitMQ. The message is handed over to the IO loop thread.
+            :param message: Message to be transmitted
+            :type message: str
+            :param routing_key: RabbitMQ routing_key
+            :type routing_key: str
+            :param signed: If this message should be signed, defaults to False
+            :type signed: boolean
+            :param exchange: RabbitMQ exchange, defaults to env.AGENTS_UL_EXCHANGE
+            :type exchange: str
+            :param confirm: If the publishing should wait for the broker confirmation, defaults to False
+            :type confirm: boolean
+        """
+
+        headers = self._build_properties(reply_to, corr_id)
+        body = self._build_body(message, self._sign(message, signed))
+        self.__publish_in_ioloop([(exchange, routing_key, headers, body)], confirm)
+
+    @HelyOSClient.auth_required
+    def publish_many(self, items, signed=False, exchange=AGENTS_UL_EXCHANGE, confirm=False):
+        """ Publish a batch of messages in RabbitMQ with a single hand-over to the IO loop thread.
+            If confirm is True, it waits until every message of the batch is confirmed, and it raises
+            HelyOSAccountConnectionError if any of them is rejected by the broker.
+
+            :param items: Messages to be transmitted as (routing_key, message) pairs
+            :type items: list of tuples
+            :param signed: If the messages should be signed, defaults to False
+            :type signed: boolean
+            :param exchange: RabbitMQ exchange, defaults to env.AGENTS_UL_EXCHANGE
+            :type exchange: str
+            :param confirm: If the publishing should wait for the broker confirmation, defaults to False
+            :type confirm: boolean
+        """
+
+        messages = [(exchange, routing_key, self._build_properties(), self._build_body(message, self._sign(message, signed)))
+                    for routing_key, message in items]
+        self.__publish_in_ioloop(messages, confirm)
+
+    @HelyOSClient.auth_required
+    def make_publisher(self, routing_key, signed=False, exchange=AGENTS_UL_EXCHANGE):
+        """ Return a publish function specialized for one routing key. See HelyOSClient.make_publisher. """
+
+        publish = self.publish
+
+        def _publish(message):
+            publish(routing_key, message, signed, exchange=exchange)
+
+        return _publish
+
+    def _checkin_channel(self):
+        # The check-in request-reply uses a temporary blocking connection, which is closed by get_checkin_result().
+        self._checkin_connection = connect_rabbitmq(self.rabbitmq_host, self.rabbitmq_port,
+                                                    self.rbmq_username, self.rbmq_password,
+                                                    self.enable_ssl, self.ca_certificate,
+                                                    vhost=self.vhost, temporary=True,
+                                                    ca_certificate_digest=self._ca_certificate_digest)
+        return self._checkin_connection.channel()
+
+    def _publish_checkin(self, headers, body):
+        self.guest_channel.basic_publish(exchange=AGENT_ANONYMOUS_EXCHANGE,
+                                         routing_key=self.checking_routing_key,
+                                         properties=headers,
+                                         body=body)
+
+    def get_checkin_result(self):
+        """ get_checkin_result() read the checkin data published by helyOS and save into the HelyOSAsyncClient instance
+            as `checkin_data`.
+
+         """
+        try:
+            super().get_checkin_result()
+        finally:
+            if self._checkin_connection is not None:
+                self._checkin_connection.close()
+                self._checkin_connection = None
+
+    @HelyOSClient.auth_required
+    def set_assignment_queue(self, exchange=AGENTS_DL_EXCHANGE):
+        self.assignment_queue = self.__call_in_ioloop(lambda done: self.channel.queue_declare('', callback=done))
+        self.__call_in_ioloop(lambda done: self.channel.queue_bind(self.assignment_queue.method.queue, exchange,
+                                                                   routing_key=self.assignment_routing_key, callback=done))
+        return self.assignment_queue
+
+    @HelyOSClient.auth_required
+    def set_instant_actions_queue(self, exchange=AGENTS_DL_EXCHANGE):
+        self.instant_actions_queue = self.__call_in_ioloop(lambda done: self.channel.queue_declare('', callback=done))
+        self.__call_in_ioloop(lambda done: self.channel.queue_bind(self.instant_actions_queue.method.queue, exchange,
+                                                                   routing_key=self.instant_actions_routing_key, callback=done))
+        return self.instant_actions_queue
+
+    @HelyOSClient.auth_required
+    def consume_assignment_messages(self, assignment_callback):
+        self.set_assignment_queue()
+        self.__call_in_ioloop(lambda done: self.channel.basic_consume(self.assignment_queue.method.queue, assignment_callback,
+                                                                      auto_ack=True, callback=done))
+
+    @HelyOSClient.auth_required
+    def consume_instant_actions_messages(self, instant_actions_callback):
+        """ Receive instant actions messages.
+            Instant actions are used by helyOS to reserve, release or cancel an assignment.
+
+            :param instant_actions_callback: call back for instant actions
+            :type instant_actions_callback: func
+
+        """
+
+        self.set_instant_actions_queue()
+        self.__call_in_ioloop(lambda done: self.channel.basic_consume(self.instant_actions_queue.method.queue, instant_actions_callback,
+                                                                      auto_ack=True, callback=done))
+
+    def start_listening(self):
+        """ The messages are consumed in the IO loop thread as soon as the callbacks are registered.
+            This method only blocks the caller until stop_listening() is called or the connection is closed.
+        """
+        self._stop_listening.clear()
+        while not self._stop_listening.wait(1.0):
+            if self._ioloop_thread is None or not self._ioloop_thread.is_alive():
+                break
+
+    def stop_listening(self):
+        self._stop_listening.set()
+
+    def close_connection(self):
+        """ Close the AMQP connection with RabbitMQ server and stop the IO loop thread """
+        with self._reconnect_lock:
+            self.__stop_ioloop()
+            self.connection = None
+            self.channel = None
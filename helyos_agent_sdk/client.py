@@ -1,12 +1,20 @@
 import time, warnings
+import sys
+import itertools
 from functools import wraps
 import pika
 import os
-import json
+import random
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import ssl
+import hashlib
+from collections import OrderedDict
 from .exceptions import *
 from helyos_agent_sdk.models import AGENT_STATE, CheckinResponseMessage
-from .crypto import Signing, generate_private_public_keys
+from .crypto import Signing, generate_private_public_keys, encode_signature
+from .utils import json_dumps, json_loads
 
 AGENTS_UL_EXCHANGE = os.environ.get(
     'AGENTS_UL_EXCHANGE', 'xchange_helyos.agents.ul')
@@ -16,23 +24,72 @@ AGENT_ANONYMOUS_EXCHANGE = os.environ.get(
     'AGENT_ANONYMOUS_EXCHANGE', 'xchange_helyos.agents.anonymous')
 REGISTRATION_TOKEN = os.environ.get(
     'REGISTRATION_TOKEN', '0000-0000-0000-0000-0000')
+PUBLISH_BATCH_SIZE = int(os.environ.get(
+    'PUBLISH_BATCH_SIZE', 64))
+PUBLISHER_POOL_SIZE = int(os.environ.get(
+    'PUBLISHER_POOL_SIZE', 1))
+PUBLISHER_POOL_TIMEOUT = float(os.environ.get(
+    'PUBLISHER_POOL_TIMEOUT', 30))
+PUBLISH_MAX_TRIES = int(os.environ.get(
+    'PUBLISH_MAX_TRIES', 4))
+SIGNATURE_ENCODING = os.environ.get(
+    'SIGNATURE_ENCODING', 'hex')
+if SIGNATURE_ENCODING not in ('hex', 'base64'):
+    raise ValueError(f"Invalid SIGNATURE_ENCODING '{SIGNATURE_ENCODING}', expected 'hex' or 'base64'.")
+# The broker deletes the check-in reply queue if it is left unused for 30 s.
+CHECKIN_QUEUE_ARGUMENTS = {'x-expires': 30000}
+
+
+# Bounded cache of SSL contexts, the least recently used context is evicted first.
+SSL_CONTEXT_CACHE_SIZE = 4
+_ssl_contexts = OrderedDict()
+_ssl_contexts_lock = threading.Lock()
+
+
+def _ca_certificate_digest(ca_certificate):
+    if ca_certificate is None:
+        return None
+    if isinstance(ca_certificate, str):
+        ca_certificate = ca_certificate.encode('utf-8')
+    return hashlib.sha256(ca_certificate).digest()
+
+
+def _build_ssl_context(ca_certificate, ca_certificate_digest=None):
+    # The context is shared by all connections using the same CA certificate,
+    # so the PEM parsing and the certificate store loading run only once.
+    if ca_certificate_digest is None:
+        ca_certificate_digest = _ca_certificate_digest(ca_certificate)
+
+    with _ssl_contexts_lock:
+        context = _ssl_contexts.get(ca_certificate_digest)
+        if context is not None:
+            _ssl_contexts.move_to_end(ca_certificate_digest)
+            return context
+
+    context = ssl.create_default_context(cadata=ca_certificate)
+    if ca_certificate is not None:
+        context.check_hostname = True
+        context.verify_mode = ssl.CERT_REQUIRED
+    else:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
 
+    with _ssl_contexts_lock:
+        _ssl_contexts[ca_certificate_digest] = context
+        if len(_ssl_contexts) > SSL_CONTEXT_CACHE_SIZE:
+            _ssl_contexts.popitem(last=False)
+    return context
 
-def connect_rabbitmq(rabbitmq_host, rabbitmq_port, username, passwd, enable_ssl=False, ca_certificate=None, vhost='/', temporary=False):
+
+def _connection_parameters(rabbitmq_host, rabbitmq_port, username, passwd, enable_ssl=False, ca_certificate=None, vhost='/', temporary=False,
+                           ca_certificate_digest=None):
     credentials = pika.PlainCredentials(username, passwd)
     if enable_ssl:
         if rabbitmq_port == 5672:
             warnings.warn('Warning: SSL is enabled, but the port is set to 5672, which is the default for non-encrypted AMQP connection.' +
                           ' Consider using port 5671.', UserWarning)
 
-        context = ssl.create_default_context(cadata=ca_certificate)
-        if ca_certificate is not None:
-            context.check_hostname = True
-            context.verify_mode = ssl.CERT_REQUIRED
-        else:
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
-
+        context = _build_ssl_context(ca_certificate, ca_certificate_digest)
         ssl_options = pika.SSLOptions(context, rabbitmq_host)
     else:
         ssl_options = None
@@ -48,6 +105,13 @@ def connect_rabbitmq(rabbitmq_host, rabbitmq_port, username, passwd, enable_ssl=
                                            credentials,
                                            heartbeat=3600,
                                            ssl_options=ssl_options)
+    return params
+
+
+def connect_rabbitmq(rabbitmq_host, rabbitmq_port, username, passwd, enable_ssl=False, ca_certificate=None, vhost='/', temporary=False,
+                     ca_certificate_digest=None):
+    params = _connection_parameters(rabbitmq_host, rabbitmq_port, username, passwd, enable_ssl, ca_certificate, vhost, temporary,
+                                    ca_certificate_digest)
     _connection = pika.BlockingConnection(params)
     return _connection
 
@@ -56,14 +120,14 @@ def connect_rabbitmq(rabbitmq_host, rabbitmq_port, username, passwd, enable_ssl=
 class HelyOSClient():
 
     def __init__(self, rabbitmq_host, rabbitmq_port=5672, uuid=None, enable_ssl=False, ca_certificate=None,
-                 helyos_public_key=None, agent_privkey=None, agent_pubkey=None, vhost='/' ):
+                 helyos_public_key=None, agent_privkey=None, agent_pubkey=None, vhost='/', send_user_id=True):
         """ HelyOS client class
 
             The client implements several functions to facilitate the
             interaction with RabbitMQ. It reads the RabbitMQ exchange names from environment variables
-            and it provides the helyOS routing-key names as properties. For SSL connections, the RabbitMQ server 
+            and it provides the helyOS routing-key names as attributes. For SSL connections, the RabbitMQ server 
             CA certificate should be provided as a string in PEM format. If the agent public and private keys are not provided,
-            they are generated by the client at the initialization, and the public key is sent to helyOS during the check-in procedure.
+            they are generated by the client in background at the initialization, and the public key is sent to helyOS during the check-in procedure.
             If the helyOS public key is not provided, it is retrieved during the check-in procedure.
 
             :param rabbitmq_host: RabbitMQ host name (e.g rabbitmq.mydomain.com)
@@ -82,18 +146,31 @@ class HelyOSClient():
             :type agent_privkey:  string (PEM format), optional
             :param agent_pubkey: Agent RSA public key is saved in helyOS core, defaults to None
             :type agent_pubkey:  string (PEM format), optional
+            :param send_user_id: Set the RabbitMQ user_id property in the published messages, defaults to True.
+                                 RabbitMQ validates this property against the connection login on every publish.
+                                 The check-in message always carries the user_id.
+            :type send_user_id: bool, optional
 
         """
         self.rabbitmq_host = rabbitmq_host
         self.rabbitmq_port = rabbitmq_port
         self.ca_certificate = ca_certificate
         self.helyos_public_key = helyos_public_key
+        self._yard_uid = None
         self.uuid = uuid
         self.enable_ssl = enable_ssl
         self.vhost = vhost
+        self.send_user_id = send_user_id
 
         self.connection = None
         self.channel = None
+        self.pub_connection = None
+        self.pub_channel = None
+        self.sub_connection = None
+        self.sub_channel = None
+        self.publisher_channel = None
+        self._channel_pool = None
+        self._publish_user_id = None
         self.checkin_data = None
         self.checkin_guard_interceptor = lambda *args, **kwargs: True
         self._protocol = 'AMQP'
@@ -103,91 +180,135 @@ class HelyOSClient():
         self.rbmq_username = None
         self.rbmq_password = None
 
+        # The RSA key generation runs in background, overlapping with the connection setup.
+        # `private_key`, `public_key` and `signing_helper` wait for it on first access.
+        self._keygen_thread = None
+        self._keygen_error = None
         if agent_pubkey is None or agent_privkey is None:
-            self.private_key, self.public_key = generate_private_public_keys()
+            self._keygen_thread = threading.Thread(target=self.__generate_keys, daemon=True)
+            self._keygen_thread.start()
         else:
-            self.private_key, self.public_key = agent_privkey, agent_pubkey
-
-        self.signing_helper = Signing(self.private_key)
+            self.__set_keys(agent_privkey, agent_pubkey)
 
         self.rabbitmq_host = rabbitmq_host
         self.rabbitmq_port = rabbitmq_port
 
     @property
-    def is_connection_open(self):
-        """ Check if the connection is open """
+    def ca_certificate(self):
+        """ Certificate authority of the RabbitMQ server """
+        return self._ca_certificate
+
+    @ca_certificate.setter
+    def ca_certificate(self, value):
+        # The digest identifies the cached SSL context, it changes only when the certificate changes.
+        self._ca_certificate = value
+        self._ca_certificate_digest = _ca_certificate_digest(value)
+
+    def __generate_keys(self):
+        # The exception is kept and re-raised by _wait_for_keys(), otherwise it would be lost in the thread.
         try:
-            self.connection.sleep(0.01)
-        except:
-            return False 
-        return self.connection.is_open
+            self.__set_keys(*generate_private_public_keys())
+        except Exception as err:
+            self._keygen_error = err
+
+    def __set_keys(self, private_key, public_key):
+        self._private_key, self._public_key = private_key, public_key
+        self._signing_helper = Signing(private_key)
+
+        # Check-in fields that do not change between check-ins.
+        self._public_key_str = public_key.decode('utf-8') if isinstance(public_key, bytes) else public_key
+        self._checkin_template = {'public_key': self._public_key_str,
+                                  'public_key_format': 'PEM',
+                                  'registration_token': REGISTRATION_TOKEN}
+
+    def _wait_for_keys(self):
+        keygen_thread = self._keygen_thread
+        if keygen_thread is not None:
+            keygen_thread.join()
+            self._keygen_thread = None
+        if self._keygen_error is not None:
+            raise self._keygen_error
 
     @property
-    def checking_routing_key(self):
-        """ Routing key value used for check in messages """
-        return f'agent.{self.uuid}.checkin'
+    def private_key(self):
+        """ Agent RSA private key """
+        self._wait_for_keys()
+        return self._private_key
 
     @property
-    def status_routing_key(self):
-        """ Routing key value used to publish agent and assigment states  """
-
-        return f'agent.{self.uuid}.state'
+    def public_key(self):
+        """ Agent RSA public key """
+        self._wait_for_keys()
+        return self._public_key
 
     @property
-    def sensors_routing_key(self):
-        """ Routing key value used for broadingcasting of positions and sensors  """
-
-        return f'agent.{self.uuid}.visualization'
-
-    @property
-    def mission_routing_key(self):
-        """ Routing key value used to publish mission requests  """
-
-        return f'agent.{self.uuid}.mission_req'
-
-    @property
-    def summary_routing_key(self):
-        """ Routing key value used to publish summary requests  """
-
-        return f'agent.{self.uuid}.summary_req'
-
-    @property
-    def database_routing_key(self):
-        """ Routing key value used to publish summary requests  """
-
-        return f'agent.{self.uuid}.database_req'
-    
-    @property
-    def yard_visualization_routing_key(self):
-        """ Routing key value used to broadcast yard visualization data """
-        if self.yard_uid:
-            return f'yard.{self.yard_uid}.visualization'
-        return None
-    
-    @property
-    def yard_update_routing_key(self):
-        """ Routing key value used to publish updates for the yard  """
-        if self.yard_uid:
-            return f'yard.{self.yard_uid}.update'
-        return None
+    def signing_helper(self):
+        """ Signing helper loaded with the agent private key """
+        self._wait_for_keys()
+        return self._signing_helper
 
     @property
-    def instant_actions_routing_key(self):
-        """ Routing key value used to read instant actions  """
-
-        return f'agent.{self.uuid}.instantActions'
+    def is_connection_open(self):
+        """ Check if both publisher and consumer connections are open """
+        # The publisher connections may be in use by other threads, therefore only their state is read.
+        if self._channel_pool is None or self.pub_connection is None or not self.pub_connection.is_open:
+            return False
+        try:
+            self.sub_connection.sleep(0.01)
+        except:
+            return False 
+        return self.sub_connection.is_open
 
     @property
-    def update_routing_key(self):
-        """ Routing key value used for agent update messages  """
+    def uuid(self):
+        """ Universal unique identifier of the agent """
+        return self._uuid
 
-        return f'agent.{self.uuid}.update'
+    @uuid.setter
+    def uuid(self, value):
+        self._uuid = value
+        self._rebuild_routing_keys()
 
     @property
-    def assignment_routing_key(self):
-        """ Routing key value used to read assigment messages  """
-
-        return f'agent.{self.uuid}.assignment'
+    def yard_uid(self):
+        """ Yard UID of the last check-in """
+        return self._yard_uid
+
+    @yard_uid.setter
+    def yard_uid(self, value):
+        self._yard_uid = value
+        self._rebuild_routing_keys()
+
+    def _rebuild_routing_keys(self):
+        """ Build the helyOS routing-key names. It runs whenever `uuid` or `yard_uid` are set.
+            The names are interned, so the same string objects are reused by all publishing calls.
+
+            - checking_routing_key: check in messages
+            - status_routing_key: publish agent and assigment states
+            - sensors_routing_key: broadcasting of positions and sensors
+            - mission_routing_key: publish mission requests
+            - summary_routing_key: publish summary requests
+            - database_routing_key: publish database requests
+            - yard_visualization_routing_key: broadcast yard visualization data, None if not checked in
+            - yard_update_routing_key: publish updates for the yard, None if not checked in
+            - instant_actions_routing_key: read instant actions
+            - update_routing_key: agent update messages
+            - assignment_routing_key: read assigment messages
+        """
+        uuid = self._uuid
+        self.checking_routing_key = sys.intern(f'agent.{uuid}.checkin')
+        self.status_routing_key = sys.intern(f'agent.{uuid}.state')
+        self.sensors_routing_key = sys.intern(f'agent.{uuid}.visualization')
+        self.mission_routing_key = sys.intern(f'agent.{uuid}.mission_req')
+        self.summary_routing_key = sys.intern(f'agent.{uuid}.summary_req')
+        self.database_routing_key = sys.intern(f'agent.{uuid}.database_req')
+        self.instant_actions_routing_key = sys.intern(f'agent.{uuid}.instantActions')
+        self.update_routing_key = sys.intern(f'agent.{uuid}.update')
+        self.assignment_routing_key = sys.intern(f'agent.{uuid}.assignment')
+
+        yard_uid = self._yard_uid
+        self.yard_visualization_routing_key = sys.intern(f'yard.{yard_uid}.visualization') if yard_uid else None
+        self.yard_update_routing_key = sys.intern(f'yard.{yard_uid}.update') if yard_uid else None
 
     def get_checkin_result(self):
         """ get_checkin_result() read the checkin data published by helyOS and save into the HelyOSClient instance
@@ -224,16 +345,21 @@ class HelyOSClient():
                 'Not able to connect as anonymous to rabbitMQ to perform check in.')
 
         # step 2 - creates a temporary queue to receive checkin response
-        temp_queue = self.guest_channel.queue_declare(queue='', exclusive=True)
+        temp_queue = self.guest_channel.queue_declare(queue='', exclusive=True, auto_delete=True,
+                                                     arguments=CHECKIN_QUEUE_ARGUMENTS)
         self.checkin_response_queue = temp_queue.method.queue
         self.guest_channel.basic_consume(
             queue=self.checkin_response_queue, auto_ack=True, on_message_callback=self.__checkin_callback_wrapper)
 
-    def __prepare_checkin_for_already_connected(self):
+    def _checkin_channel(self):
+        return self.sub_channel
+
+    def _prepare_checkin_for_already_connected(self):
         # step 1 - use existent connection
-        self.guest_channel = self.channel
+        self.guest_channel = self._checkin_channel()
         # step 2 - creates a temporary queue to receive checkin response
-        temp_queue = self.guest_channel.queue_declare(queue='', exclusive=True)
+        temp_queue = self.guest_channel.queue_declare(queue='', exclusive=True, auto_delete=True,
+                                                     arguments=CHECKIN_QUEUE_ARGUMENTS)
         self.checkin_response_queue = temp_queue.method.queue
         self.guest_channel.basic_consume(
             queue=self.checkin_response_queue, auto_ack=True, on_message_callback=self.__checkin_callback_wrapper)
@@ -246,6 +372,105 @@ class HelyOSClient():
         self.connect(self.rbmq_username, self.rbmq_password)
         self.is_reconecting = False
 
+    def __open_publisher_slot(self, username, password):
+        # pika connections are not thread-safe, therefore each pooled slot owns its connection.
+        connection = connect_rabbitmq(self.rabbitmq_host, self.rabbitmq_port,
+                                      username, password,
+                                      self.enable_ssl, self.ca_certificate,
+                                      vhost=self.vhost, ca_certificate_digest=self._ca_certificate_digest)
+        channel = connection.channel()
+        confirm_channel = connection.channel()
+        confirm_channel.confirm_delivery()
+        return channel, confirm_channel
+
+    def __reopen_publisher_slot(self):
+        slot = self.__open_publisher_slot(self.rbmq_username, self.rbmq_password)
+        pub_connection = self.pub_connection
+        if pub_connection is not None and not pub_connection.is_open:
+            self.pub_channel, self.publisher_channel = slot
+            self.pub_connection = self.pub_channel.connection
+        return slot
+
+    def __open_publisher(self, username, password):
+        # A bounded pool of publisher channels: concurrent threads publish on distinct channels
+        # and block when all channels are in use.
+        pool = queue.Queue(maxsize=PUBLISHER_POOL_SIZE)
+        try:
+            for i in range(PUBLISHER_POOL_SIZE):
+                pool.put(self.__open_publisher_slot(username, password))
+        except Exception:
+            while not pool.empty():
+                self.__close_publisher_slot(pool.get_nowait())
+            raise
+
+        self._channel_pool = pool
+        self.pub_channel, self.publisher_channel = pool.queue[0]
+        self.pub_connection = self.pub_channel.connection
+
+    def __close_publisher(self):
+        # Slots checked out by other threads are closed when they are released.
+        pool, self._channel_pool = self._channel_pool, None
+        self.pub_connection = self.pub_channel = self.publisher_channel = None
+        while pool is not None:
+            try:
+                slot = pool.get_nowait()
+            except queue.Empty:
+                break
+            self.__close_publisher_slot(slot)
+
+    def __close_publisher_slot(self, slot):
+        if slot is None or not slot[0].connection.is_open:
+            return
+        try:
+            slot[0].connection.close()
+        except Exception as err:
+            print(err)
+
+    def __checkout_publisher_slot(self):
+        pool = self._channel_pool
+        if pool is None:
+            raise HelyOSAccountConnectionError('The publisher connections are closed.')
+        try:
+            return pool, pool.get(timeout=PUBLISHER_POOL_TIMEOUT)
+        except queue.Empty:
+            raise HelyOSAccountConnectionError('Timeout waiting for a free publisher channel.')
+
+    def __release_publisher_slot(self, pool, slot):
+        if slot is not None and not (slot[0].is_open and slot[1].is_open):
+            # A broken slot is returned as None, the next publish on it opens a new connection.
+            self.__close_publisher_slot(slot)
+            slot = None
+        if pool is self._channel_pool:
+            pool.put(slot)
+        else:
+            # The pool was closed or replaced while the slot was in use.
+            self.__close_publisher_slot(slot)
+
+    def __close_subscriber(self):
+        connection, self.sub_connection = self.sub_connection, None
+        self.sub_channel = None
+        if connection is not None and connection.is_open:
+            try:
+                connection.close()
+            except Exception as err:
+                print(err)
+
+    def _open_connections(self, username, password):
+        # Publisher and consumer use separated TCP connections, so the flow control of one does not stall the other.
+        # The connections of a previous connect() are closed first, so reconnecting does not leak them.
+        self.__close_publisher()
+        self.__close_subscriber()
+        self.__open_publisher(username, password)
+        self.sub_connection = connect_rabbitmq(self.rabbitmq_host, self.rabbitmq_port,
+                                               username, password,
+                                               self.enable_ssl, self.ca_certificate,
+                                               vhost=self.vhost, ca_certificate_digest=self._ca_certificate_digest)
+        self.sub_channel = self.sub_connection.channel()
+        self.connection = self.sub_connection
+        self.channel = self.sub_channel
+        self.rbmq_username = username
+        self.rbmq_password = password
+        self._publish_user_id = username if self.send_user_id else None
 
     def connect(self, username, password):
         """
@@ -264,13 +489,7 @@ class HelyOSClient():
         """
         print("connecting... ")
         try:
-            self.connection = connect_rabbitmq(self.rabbitmq_host, self.rabbitmq_port, 
-                                               username, password,
-                                               self.enable_ssl, self.ca_certificate,
-                                               vhost=self.vhost)
-            self.channel = self.connection.channel()
-            self.rbmq_username = username
-            self.rbmq_password = password 
+            self._open_connections(username, password)
             print("connected")
 
         except Exception as inst:
@@ -305,7 +524,7 @@ class HelyOSClient():
         :type checkin_guard_interceptor: function
         """
         if self.connection:
-            self.__prepare_checkin_for_already_connected()
+            self._prepare_checkin_for_already_connected()
             username = self.rbmq_username
         else:
             self.__connect_as_anonymous()
@@ -315,28 +534,40 @@ class HelyOSClient():
             self.checkin_guard_interceptor = checkin_guard_interceptor
 
         self.yard_uid = yard_uid
+        self._wait_for_keys()
         checkin_msg = {'type': 'checkin',
                         'uuid': self.uuid,
                         'body': {'yard_uid': yard_uid,
                                 'status': status,
-                                'public_key': self.public_key.decode('utf-8'),
-                                'public_key_format': 'PEM',
-                                'registration_token': REGISTRATION_TOKEN,
+                                **self._checkin_template,
                                 **agent_data},
                         }
         
-        message = json.dumps(checkin_msg, sort_keys=True)
+        # Only the signed inner message needs a canonical key order.
+        message = json_dumps(checkin_msg, sort_keys=signed).decode('utf-8')
         signature = None
         if signed:
-            signature = self.signing_helper.return_signature(message).hex()
+            signature = self.signing_helper.return_signature(message)
 
-        body = json.dumps({'message': message, 'signature': signature}, sort_keys=True)
+        body = json_dumps(self._build_envelope(message, signature))
 
-        self.guest_channel.basic_publish(exchange=AGENT_ANONYMOUS_EXCHANGE,
-                                         routing_key=self.checking_routing_key,
-                                         properties=pika.BasicProperties(
-                                             reply_to=self.checkin_response_queue, user_id=username, timestamp=int(time.time()*1000)),
-                                         body=body)
+        headers = pika.BasicProperties(reply_to=self.checkin_response_queue, user_id=username, timestamp=time.time_ns() // 1_000_000)
+        if not self.connection:
+            self.guest_channel.basic_publish(exchange=AGENT_ANONYMOUS_EXCHANGE,
+                                             routing_key=self.checking_routing_key,
+                                             properties=headers,
+                                             body=body)
+            return
+
+        self._publish_checkin(headers, body)
+
+    def _publish_checkin(self, headers, body):
+        pool, slot = self.__checkout_publisher_slot()
+        try:
+            slot = self.__basic_publish(slot, False, AGENT_ANONYMOUS_EXCHANGE, self.checking_routing_key,
+                                        headers, body)
+        finally:
+            self.__release_publisher_slot(pool, slot)
 
     def __checkin_callback_wrapper(self, channel, method, properties, received_str):
         try:
@@ -349,10 +580,10 @@ class HelyOSClient():
                 channel.stop_consuming()
 
     def __checkin_callback(self, ch, properties, received_str):
-        payload = json.loads(received_str)
+        payload = json_loads(received_str)
         received_message_str = payload['message']
         signature = payload['signature']
-        received_message = json.loads(received_message_str)
+        received_message = json_loads(received_message_str)
         sender = None
         if hasattr(properties, 'user_id'):
             sender = properties.user_id
@@ -385,26 +616,77 @@ class HelyOSClient():
             self.helyos_public_key = body.get('helyos_public_key', self.helyos_public_key)
 
         if password:
-            self.connection = connect_rabbitmq(self.rabbitmq_host, self.rabbitmq_port,
-                                               body['rbmq_username'], password, 
-                                               self.enable_ssl, self.ca_certificate,
-                                               vhost=self.vhost)
-            self.channel = self.connection.channel()
-            self.rbmq_username = body['rbmq_username']
-            self.rbmq_password = password
+            self._open_connections(body['rbmq_username'], password)
 
             print('uuid', self.uuid)
             print('username', body['rbmq_username'])
             print('password', len(password)*'*')
 
         self.uuid = received_message['uuid']
-        try:
-            self.checkin_data = CheckinResponseMessage(**received_message)
-        except:
-            self.checkin_data = body
+        self.checkin_data = checkin_data
+
+    def _sign(self, message, signed):
+        if not signed:
+            return None
+        return self.signing_helper.return_signature(message)
+
+    def _build_envelope(self, message, signature):
+        if signature is None:
+            return {'message': message, 'signature': None}
+        if SIGNATURE_ENCODING == 'hex':
+            return {'message': message, 'signature': signature.hex()}
+        # Non-default encodings are announced to helyOS core in the sig_encoding field.
+        return {'message': message, 'signature': encode_signature(signature, SIGNATURE_ENCODING),
+                'sig_encoding': SIGNATURE_ENCODING}
+
+    def _build_body(self, message, signature):
+        if signature is None and isinstance(message, str):
+            # The unsigned envelope has a fixed layout, only the message string needs to be encoded.
+            return b'{"message":' + json_dumps(message) + b',"signature":null}'
+
+        return json_dumps(self._build_envelope(message, signature))
+
+    def _build_properties(self, reply_to=None, corr_id=None):
+        return pika.BasicProperties(user_id=self._publish_user_id,
+                                    timestamp=time.time_ns() // 1_000_000,
+                                    reply_to=reply_to,
+                                    correlation_id=corr_id)
+
+    def __basic_publish(self, slot, confirm, exchange, routing_key, headers, body):
+        checked_out_slot = slot
+        for attempt in range(PUBLISH_MAX_TRIES):
+            if slot is None:
+                # Only this slot is reopened, the other threads keep publishing on their own slots.
+                try:
+                    slot = self.__reopen_publisher_slot()
+                except Exception as err:
+                    print(err)
+                    # Exponential backoff with jitter before the next attempt.
+                    time.sleep(min(0.25 * 2**attempt, 4.0) + random.random() * 0.1)
+                    continue
+
+            channel = slot[1] if confirm else slot[0]
+            try:
+                channel.basic_publish(exchange, routing_key,
+                                      properties=headers,
+                                      body=body)
+                return slot
+            except (pika.exceptions.AMQPConnectionError, pika.exceptions.ChannelWrongStateError,
+                    pika.exceptions.ChannelClosed) as err:
+                print(f"Connection error when publishing. Reconnecting... try {attempt}")
+            except Exception:
+                # The caller releases the slot it checked out, a reopened one would be leaked.
+                if slot is not checked_out_slot:
+                    self.__close_publisher_slot(slot)
+                raise
+
+            self.__close_publisher_slot(slot)
+            slot = None
+
+        raise HelyOSAccountConnectionError("Connection error when publishing.")
 
     @auth_required
-    def publish(self, routing_key, message, signed=False, reply_to=None, corr_id=None, exchange=AGENTS_UL_EXCHANGE):
+    def publish(self, routing_key, message, signed=False, reply_to=None, corr_id=None, exchange=AGENTS_UL_EXCHANGE, confirm=False):
         """ Publish message in RabbitMQ
             :param message: Message to be transmitted
             :type message: str
@@ -414,67 +696,140 @@ class HelyOSClient():
             :type signed: boolean
             :param exchange: RabbitMQ exchange, defaults to env.AGENTS_UL_EXCHANGE
             :type exchange: str
+            :param confirm: If the publishing should wait for the broker confirmation, defaults to False
+            :type confirm: boolean
         """
 
         if self.is_reconecting:
             return
 
-        signature = None
+        body = self._build_body(message, self._sign(message, signed))
+        headers = self._build_properties(reply_to, corr_id)
+        pool, slot = self.__checkout_publisher_slot()
+        try:
+            slot = self.__basic_publish(slot, confirm, exchange, routing_key,
+                                        headers,
+                                        body)
+        finally:
+            self.__release_publisher_slot(pool, slot)
+
+    @auth_required
+    def publish_many(self, items, signed=False, exchange=AGENTS_UL_EXCHANGE, confirm=False):
+        """ Publish a batch of messages in RabbitMQ, one after the other on the same publisher channel.
+            Pending AMQP frames (e.g. heartbeats) are processed every env.PUBLISH_BATCH_SIZE messages,
+            so long batches do not starve the connection. With confirm=True, each message waits for its
+            own broker confirmation; HelyOSAsyncClient.publish_many waits once for the whole batch.
+            Signed messages are signed by a worker thread that runs ahead of the publishing loop.
+
+            .. code-block:: python
+
+                helyos_client.publish_many([(helyos_client.sensors_routing_key, msg) for msg in messages])
+
+            :param items: Messages to be transmitted as (routing_key, message) pairs
+            :type items: list of tuples
+            :param signed: If the messages should be signed, defaults to False
+            :type signed: boolean
+            :param exchange: RabbitMQ exchange, defaults to env.AGENTS_UL_EXCHANGE
+            :type exchange: str
+            :param confirm: If the publishing should wait for the broker confirmations, defaults to False
+            :type confirm: boolean
+        """
+
+        if self.is_reconecting:
+            return
+
+        items = list(items)
+        signatures = itertools.repeat(None)
+        sign_pool = None
         if signed:
-            signature = self.signing_helper.return_signature(message).hex()
-        
+            # The signatures are computed by a worker thread of this call, running ahead of the publishing loop.
+            sign_pool = ThreadPoolExecutor(max_workers=1)
+            signatures = sign_pool.map(self.signing_helper.return_signature, [message for _, message in items])
 
-        headers = pika.BasicProperties( user_id=self.rbmq_username, 
-                                        timestamp=int(time.time()*1000),
-                                        reply_to=reply_to,
-                                        correlation_id=corr_id)
-        
-        body = json.dumps({'message': message, 'signature': signature}, sort_keys=True)
+        pool, slot = None, None
+        try:
+            pool, slot = self.__checkout_publisher_slot()
+            for count, ((routing_key, message), signature) in enumerate(zip(items, signatures), 1):
+                slot = self.__basic_publish(slot, confirm, exchange, routing_key,
+                                            self._build_properties(),
+                                            self._build_body(message, signature))
+                if count % PUBLISH_BATCH_SIZE == 0:
+                    slot[0].connection.process_data_events(time_limit=0)
+        finally:
+            if pool is not None:
+                self.__release_publisher_slot(pool, slot)
+            if sign_pool is not None:
+                sign_pool.shutdown(wait=False)
+
+    @auth_required
+    def make_publisher(self, routing_key, signed=False, exchange=AGENTS_UL_EXCHANGE):
+        """ Return a publish function specialized for one routing key.
+            The routing key, exchange and signing option are bound once, so the returned function skips
+            the authentication check and the argument handling of publish().
+            The publisher pool and the user_id are read from the client on each call, so it keeps working
+            after reconnect(), and it raises HelyOSAccountConnectionError after close_connection().
+
+            .. code-block:: python
+
+                publish_sensors = helyos_client.make_publisher(helyos_client.sensors_routing_key)
+                for msg in messages:
+                    publish_sensors(msg)
+
+            :param routing_key: RabbitMQ routing_key
+            :type routing_key: str
+            :param signed: If the messages should be signed, defaults to False
+            :type signed: boolean
+            :param exchange: RabbitMQ exchange, defaults to env.AGENTS_UL_EXCHANGE
+            :type exchange: str
+            :return: function that publishes a message
+            :rtype: callable
+        """
+
+        routing_key = sys.intern(routing_key)
+        build_properties = self._build_properties
+        checkout_slot = self.__checkout_publisher_slot
+        release_slot = self.__release_publisher_slot
+        basic_publish = self.__basic_publish
+        build_body = self._build_body
+
+        if signed:
+            return_signature = self.signing_helper.return_signature
+
+            def build(message):
+                return build_body(message, return_signature(message))
+        else:
+            def build(message):
+                return build_body(message, None)
 
-        is_trying = True
-        while is_trying:    
+        def _publish(message):
+            headers = build_properties()
+            body = build(message)
+            pool, slot = checkout_slot()
             try:
-                self.channel.basic_publish(exchange, routing_key,
-                                        properties=headers,
-                                        body=body)
-                is_trying = False
-                
-                
-            except pika.exceptions.AMQPConnectionError as err:
-                print(f"Connection error when publishing. Reconnecting... try {self.tries}")
-                self.tries += 1                
-                if self.tries > 3:
-                    self.tries = 0
-                    raise HelyOSAccountConnectionError("Connection error when publishing.")
-                
-                try: 
-                    self.reconnect()
-                    is_trying = False
-                    self.tries = 0
-                except Exception as err:
-                    print(err)
-                    is_trying = True
-                time.sleep(3)  # Wait for a few seconds before reconnecting
-                
+                slot = basic_publish(slot, False, exchange, routing_key, headers, body)
+            finally:
+                release_slot(pool, slot)
+
+        return _publish
 
     @auth_required
     def set_assignment_queue(self, exchange=AGENTS_DL_EXCHANGE):
-        self.assignment_queue = self.channel.queue_declare(queue='')
-        self.channel.queue_bind(queue=self.assignment_queue.method.queue,
+        self.assignment_queue = self.sub_channel.queue_declare(queue='')
+        self.sub_channel.queue_bind(queue=self.assignment_queue.method.queue,
                                 exchange=exchange, routing_key=self.assignment_routing_key)
         return self.assignment_queue
 
     @auth_required
     def set_instant_actions_queue(self, exchange=AGENTS_DL_EXCHANGE):
-        self.instant_actions_queue = self.channel.queue_declare(queue='')
-        self.channel.queue_bind(queue=self.instant_actions_queue.method.queue,
+        self.instant_actions_queue = self.sub_channel.queue_declare(queue='')
+        self.sub_channel.queue_bind(queue=self.instant_actions_queue.method.queue,
                                 exchange=exchange, routing_key=self.instant_actions_routing_key)
         return self.instant_actions_queue
 
     @auth_required
     def consume_assignment_messages(self, assignment_callback):
         self.set_assignment_queue()
-        self.channel.basic_consume(queue=self.assignment_queue.method.queue, auto_ack=True,
+        self.sub_channel.basic_consume(queue=self.assignment_queue.method.queue, auto_ack=True,
                                    on_message_callback=assignment_callback)
 
     @auth_required
@@ -488,16 +843,19 @@ class HelyOSClient():
         """
 
         self.set_instant_actions_queue()
-        self.channel.basic_consume(queue=self.instant_actions_queue.method.queue, auto_ack=True,
+        self.sub_channel.basic_consume(queue=self.instant_actions_queue.method.queue, auto_ack=True,
                                    on_message_callback=instant_actions_callback)
 
     def start_listening(self):
-        self.channel.start_consuming()
+        self.sub_channel.start_consuming()
 
     def stop_listening(self):
-        self.channel.stop_consuming()
+        self.sub_channel.stop_consuming()
 
     def close_connection(self):
-        """ Close the AMQP connection with RabbitMQ server """
-        self.connection.close()
+        """ Close the publisher and consumer AMQP connections with RabbitMQ server """
+        self.__close_publisher()
+        self.__close_subscriber()
+        self.connection = None
+        self.channel = None
     
\ No newline at end of file
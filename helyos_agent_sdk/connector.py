@@ -254,7 +254,7 @@ class AgentConnector():
                 {'type': AGENT_MESSAGE_TYPE.UPDATE.value,
                  'uuid': self.helyos_client.uuid,
                  'body': body,
-                 }, sort_keys=True),
+                 }, sort_keys=signed),
             signed=signed
         )
 
@@ -289,7 +289,7 @@ class AgentConnector():
 
         self.helyos_client.publish(
             routing_key=self.helyos_client.status_routing_key,
-            message=json.dumps(message_dict, sort_keys=True),
+            message=json.dumps(message_dict, sort_keys=signed),
             signed=signed
         )
 
@@ -322,7 +322,7 @@ class AgentConnector():
                  'body': {'pose': {'x': x, 'y': y, 'z': z, 'orientations': orientations},
                           'sensors': sensors
                           }
-                 }, sort_keys=True),
+                 }, sort_keys=signed),
             signed=signed
         )
 
@@ -352,7 +352,7 @@ class AgentConnector():
                           'agent_uuids': agent_uuids,
                           'yard_uid': self.helyos_client.yard_uid,
                           }
-                 }, sort_keys=True),
+                 }, sort_keys=signed),
             signed=signed
 
         )
@@ -5,6 +5,7 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.backends.openssl.rsa import _RSAPrivateKey
 import json
+import base64
 
 
 def generate_private_public_keys():
@@ -21,17 +22,33 @@ def generate_private_public_keys():
     return priv, pub
 
 
-def verify_signature(message_string, signature, public_key):
+def encode_signature(signature, encoding='hex'):
+    """ Encode the signature bytes as a string
+
+        :param signature: The signature of the message
+        :type signature: bytes
+        :param encoding: 'hex' or 'base64', defaults to 'hex'
+        :type encoding: str
+
+    """
+    if encoding == 'base64':
+        return base64.b64encode(signature).decode('ascii')
+    return signature.hex()
+
+
+def verify_signature(message_string, signature, public_key, sig_encoding='hex'):
     """ Verify the signature of a message with the public key provided
 
         Implements the function that verifies the signature of a message
 
         :param message_string: The message
         :type message_string: str
-        :param signature: The signature of the message in hex or bytes format
+        :param signature: The signature of the message in hex, base64 or bytes format
         :type signature: bytes, str
         :param public_key: The public key for verifying the signature of the message
         :type public_key: bytes, str, list
+        :param sig_encoding: Encoding of string signatures, 'hex' or 'base64', defaults to 'hex'
+        :type sig_encoding: str
 
     """
     try:
@@ -56,7 +73,9 @@ def verify_signature(message_string, signature, public_key):
         # Padding: PSS is the recommended choice for any new protocols or applications, PKCS1v15 should only be used to support legacy protocols.
         # verify signature using hex string signature
         
-        if type(signature) is str:
+        if type(signature) is str and sig_encoding == 'base64':
+            byte_signature = base64.b64decode(signature)
+        elif type(signature) is str:
             byte_signature = bytes.fromhex(signature)
         else:
             byte_signature = signature
@@ -323,15 +323,15 @@ class HelyOSMQTTClient():
                                 **agent_data},
                        }
         
-        message = json.dumps(checkin_msg, sort_keys=True)
+        message = json.dumps(checkin_msg, sort_keys=signed)
         signature = None
         if signed:
             signature = list(self.signing_helper.return_signature(message))
 
-        body = json.dumps({'message': message, 'signature': signature, 'headers': {'timestamp': int(time.time()*1000),
+        body = json.dumps({'message': message, 'signature': signature, 'headers': {'timestamp': time.time_ns() // 1_000_000,
                                                                                     'replyTo': self.checkin_response_queue,
                                                                                     'reply_to': self.checkin_response_queue,
-                                                                                    'user_id': username }}, sort_keys=True)
+                                                                                    'user_id': username }})
 
         self.guest_channel.publish(
             self.checking_routing_key, payload=body)
@@ -393,10 +393,7 @@ class HelyOSMQTTClient():
             print('password', len(password)*'*')
 
         self.uuid = received_message['uuid']
-        try:
-            self.checkin_data = CheckinResponseMessage(**received_message)
-        except:
-            self.checkin_data = body
+        self.checkin_data = checkin_data
 
     @auth_required
     def publish(self, routing_key, message, signed=False, reply_to=None, corr_id=None, exchange=AGENTS_MQTT_EXCHANGE):
@@ -420,12 +417,12 @@ class HelyOSMQTTClient():
 
 
         headers = { 'user_id': self.rbmq_username,
-                    'timestamp': int(time.time()*1000),
+                    'timestamp': time.time_ns() // 1_000_000,
                     'reply_to':reply_to,
                     'correlation_id': corr_id}    
         
         body = json.dumps({'message': message, 'signature': signature,
-                        'headers':  headers}, sort_keys=True)
+                        'headers':  headers})
         
         is_trying = True
         while is_trying:    
@@ -81,7 +81,7 @@ class SummaryRPC():
                 reply_to=self.callback_queue,
                 correlation_id=self.corr_id,
                 user_id=self.username,
-                timestamp=int(time.time()*1000),
+                timestamp=time.time_ns() // 1_000_000,
             ),
             body=json.dumps({'body': request}))
         self.connection.process_data_events(time_limit=None)
@@ -1,3 +1,29 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the standard json module is used instead.
+    orjson = None
+
+
+def json_dumps(obj, sort_keys=False):
+    """Serialize obj to UTF-8 encoded JSON bytes. It uses orjson if installed."""
+
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=option)
+    # Compact separators, so the bytes on the wire do not depend on orjson being installed.
+    return json.dumps(obj, sort_keys=sort_keys, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def json_loads(data):
+    """Deserialize JSON str or bytes. It uses orjson if installed."""
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 
 
 def replicate_helyos_client(helyos_client):
@@ -8,4 +34,4 @@ def replicate_helyos_client(helyos_client):
                         helyos_client.uuid,helyos_client.enable_ssl,
                         helyos_client.ca_certificate, helyos_client.helyos_public_key,
                         helyos_client.private_key, helyos_client.public_key,
-                        helyos_client.vhost)
\ No newline at end of file
+                        helyos_client.vhost)
@@ -0,0 +1,174 @@
+import queue
+import threading
+import time
+from unittest import mock
+
+import pika
+import pytest
+
+import helyos_agent_sdk.async_client as async_client
+from helyos_agent_sdk.crypto import generate_private_public_keys
+from helyos_agent_sdk.exceptions import HelyOSAccountConnectionError, HelyOSClientAutheticationError
+
+
+class FakeIOLoop:
+    def __init__(self):
+        self.callbacks = queue.Queue()
+        self.running = False
+
+    def add_callback_threadsafe(self, callback):
+        self.callbacks.put(callback)
+
+    def stop(self):
+        self.running = False
+
+    def start(self):
+        self.running = True
+        while self.running:
+            try:
+                callback = self.callbacks.get(timeout=0.01)
+            except queue.Empty:
+                continue
+            callback()
+
+
+class FakeFrame:
+    def __init__(self, method):
+        self.method = method
+
+
+class FakeChannel:
+    def __init__(self, connection):
+        self.connection = connection
+        self.published = []
+        self.nacked_tags = set()
+
+    def add_on_close_callback(self, callback):
+        self.on_close = callback
+
+    def confirm_delivery(self, ack_nack_callback, callback=None):
+        self.on_confirm = ack_nack_callback
+        callback(FakeFrame(pika.spec.Confirm.SelectOk()))
+
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        if exchange == 'missing_exchange':
+            raise pika.exceptions.ChannelWrongStateError('Channel is closed.')
+        self.published.append((exchange, routing_key, body))
+        tag = len(self.published)
+        method = pika.spec.Basic.Nack if tag in self.nacked_tags else pika.spec.Basic.Ack
+        self.connection.ioloop.add_callback_threadsafe(lambda: self.on_confirm(FakeFrame(method(delivery_tag=tag))))
+
+    def close_by_broker(self):
+        self.connection.ioloop.add_callback_threadsafe(lambda: self.on_close(self, 'NOT_FOUND'))
+
+
+class FakeSelectConnection:
+    opened = 0
+
+    def __init__(self, params, on_open_callback, on_open_error_callback, on_close_callback):
+        FakeSelectConnection.opened += 1
+        self.params = params
+        self.ioloop = FakeIOLoop()
+        self.is_open = False
+        self.on_close = on_close_callback
+
+        def open_connection():
+            self.is_open = True
+            on_open_callback(self)
+
+        self.ioloop.add_callback_threadsafe(open_connection)
+
+    def channel(self, on_open_callback):
+        self.fake_channel = FakeChannel(self)
+        on_open_callback(self.fake_channel)
+
+    def close(self):
+        self.is_open = False
+        self.on_close(self, None)
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.fixture(scope='module')
+def keys():
+    return generate_private_public_keys()
+
+
+@pytest.fixture
+def helyos_client(keys):
+    with mock.patch.object(async_client.pika, 'SelectConnection', FakeSelectConnection):
+        helyos_client = async_client.HelyOSAsyncClient('localhost', uuid='agent-1', agent_privkey=keys[0], agent_pubkey=keys[1])
+        helyos_client.connect('user', 'password')
+        yield helyos_client
+        helyos_client.close_connection()
+
+
+def test_publish_many_waits_for_every_confirm(helyos_client):
+    items = [(helyos_client.sensors_routing_key, f'message {i}') for i in range(3)]
+    helyos_client.publish_many(items, confirm=True)
+
+    assert len(helyos_client.connection.fake_channel.published) == 3
+    assert helyos_client._pending_confirms == {}
+
+
+def test_publish_many_fails_if_an_earlier_message_is_nacked(helyos_client):
+    helyos_client.connection.fake_channel.nacked_tags = {1}
+    items = [(helyos_client.sensors_routing_key, f'message {i}') for i in range(3)]
+
+    with pytest.raises(HelyOSAccountConnectionError):
+        helyos_client.publish_many(items, confirm=True)
+
+
+def test_channel_closed_by_broker_is_cleared(helyos_client):
+    helyos_client.connection.fake_channel.close_by_broker()
+
+    wait_until(lambda: helyos_client.channel is None)
+    assert not helyos_client.is_connection_open
+
+
+def test_publish_error_does_not_stop_the_ioloop(helyos_client):
+    with pytest.raises(HelyOSAccountConnectionError):
+        helyos_client.publish(helyos_client.status_routing_key, 'message', exchange='missing_exchange', confirm=True)
+
+    assert helyos_client._ioloop_thread.is_alive()
+    helyos_client.publish(helyos_client.status_routing_key, 'message', confirm=True)
+
+
+def test_concurrent_publishers_reconnect_once(helyos_client):
+    helyos_client.connection.fake_channel.close_by_broker()
+    wait_until(lambda: helyos_client.channel is None)
+    opened = FakeSelectConnection.opened
+    errors = []
+
+    def publish(i):
+        try:
+            helyos_client.publish(helyos_client.status_routing_key, f'message {i}', confirm=True)
+        except Exception as err:
+            errors.append(err)
+
+    with mock.patch.object(async_client.pika, 'SelectConnection', FakeSelectConnection):
+        threads = [threading.Thread(target=publish, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+    assert errors == []
+    assert FakeSelectConnection.opened == opened + 1
+    assert len(helyos_client.connection.fake_channel.published) == 8
+
+
+def test_publish_after_close_connection_raises(helyos_client):
+    helyos_client.close_connection()
+    opened = FakeSelectConnection.opened
+
+    with mock.patch.object(async_client.pika, 'SelectConnection', FakeSelectConnection):
+        with pytest.raises(HelyOSClientAutheticationError):
+            helyos_client.publish(helyos_client.status_routing_key, 'message')
+
+    assert FakeSelectConnection.opened == opened
@@ -0,0 +1,150 @@
+from unittest import mock
+
+import pika
+import pytest
+
+import helyos_agent_sdk.client as client
+from helyos_agent_sdk.crypto import generate_private_public_keys
+from helyos_agent_sdk.exceptions import HelyOSAccountConnectionError, HelyOSClientAutheticationError
+
+
+@pytest.fixture(scope='module')
+def keys():
+    return generate_private_public_keys()
+
+
+def fake_connect_rabbitmq(*args, **kwargs):
+    connection = mock.MagicMock()
+    connection.is_open = True
+
+    def close():
+        connection.is_open = False
+
+    def basic_publish(*args, **kwargs):
+        if not connection.is_open:
+            raise pika.exceptions.ChannelWrongStateError('Channel is closed.')
+
+    def channel():
+        ch = mock.MagicMock()
+        ch.connection = connection
+        type(ch).is_open = mock.PropertyMock(side_effect=lambda: connection.is_open)
+        ch.basic_publish.side_effect = basic_publish
+        return ch
+
+    connection.close.side_effect = close
+    connection.channel.side_effect = channel
+    return connection
+
+
+@pytest.fixture
+def helyos_client(keys):
+    with mock.patch.object(client, 'connect_rabbitmq', side_effect=fake_connect_rabbitmq):
+        helyos_client = client.HelyOSClient('localhost', uuid='agent-1', agent_privkey=keys[0], agent_pubkey=keys[1])
+        helyos_client.connect('user', 'password')
+        yield helyos_client
+
+
+def test_publish_releases_the_slot(helyos_client):
+    helyos_client.publish(helyos_client.status_routing_key, 'message')
+
+    helyos_client.pub_channel.basic_publish.assert_called_once()
+    assert helyos_client._channel_pool.qsize() == client.PUBLISHER_POOL_SIZE
+
+
+def test_publish_after_close_connection_raises(helyos_client):
+    pub_connection = helyos_client.pub_connection
+    sub_connection = helyos_client.sub_connection
+    helyos_client.close_connection()
+
+    pub_connection.close.assert_called_once()
+    sub_connection.close.assert_called_once()
+    with pytest.raises(HelyOSClientAutheticationError):
+        helyos_client.publish(helyos_client.status_routing_key, 'message')
+
+
+def test_reconnect_closes_previous_connections(helyos_client):
+    old_pub_connection = helyos_client.pub_connection
+    old_sub_connection = helyos_client.sub_connection
+    helyos_client.reconnect()
+
+    old_pub_connection.close.assert_called_once()
+    old_sub_connection.close.assert_called_once()
+    assert helyos_client.pub_connection is not old_pub_connection
+    assert helyos_client.sub_connection is not old_sub_connection
+
+
+def test_slot_in_use_during_reconnect_is_closed_on_release(helyos_client):
+    # Another thread reconnects while this publish holds the slot.
+    old_pub_channel = helyos_client.pub_channel
+    old_pub_channel.basic_publish.side_effect = lambda *args, **kwargs: helyos_client.reconnect()
+    helyos_client.publish(helyos_client.status_routing_key, 'message')
+
+    assert old_pub_channel.connection.close.called
+    assert all(slot[0] is not old_pub_channel for slot in helyos_client._channel_pool.queue)
+
+
+def test_checkout_timeout_raises(helyos_client):
+    slots = [helyos_client._channel_pool.get() for _ in range(client.PUBLISHER_POOL_SIZE)]
+    with mock.patch.object(client, 'PUBLISHER_POOL_TIMEOUT', 0.01):
+        with pytest.raises(HelyOSAccountConnectionError):
+            helyos_client.publish(helyos_client.status_routing_key, 'message')
+    assert len(slots) == client.PUBLISHER_POOL_SIZE
+
+
+def test_failed_publish_reopens_only_the_slot(helyos_client):
+    helyos_client.pub_channel.basic_publish.side_effect = pika.exceptions.AMQPConnectionError()
+    old_sub_connection = helyos_client.sub_connection
+    with mock.patch.object(client, 'connect_rabbitmq', side_effect=fake_connect_rabbitmq):
+        helyos_client.publish(helyos_client.status_routing_key, 'message')
+
+    helyos_client.pub_channel.basic_publish.assert_called_once()
+    assert helyos_client.sub_connection is old_sub_connection
+    assert not helyos_client.is_reconecting
+
+
+def test_failed_reopen_is_retried_by_later_publishes(helyos_client):
+    helyos_client.pub_channel.basic_publish.side_effect = pika.exceptions.AMQPConnectionError()
+    with mock.patch.object(client, 'connect_rabbitmq', side_effect=pika.exceptions.AMQPConnectionError()), \
+            mock.patch.object(client.time, 'sleep'):
+        with pytest.raises(HelyOSAccountConnectionError):
+            helyos_client.publish(helyos_client.status_routing_key, 'message')
+
+    # The broker is back: the next publish opens a new slot instead of using the closed one.
+    with mock.patch.object(client, 'connect_rabbitmq', side_effect=fake_connect_rabbitmq) as connect:
+        for _ in range(3):
+            helyos_client.publish(helyos_client.status_routing_key, 'message')
+
+    connect.assert_called_once()
+    assert helyos_client.pub_channel.basic_publish.call_count == 3
+    assert helyos_client.is_connection_open
+
+
+def test_channel_closed_by_broker_is_reopened(helyos_client):
+    helyos_client.publisher_channel.basic_publish.side_effect = pika.exceptions.ChannelClosedByBroker(404, 'NOT_FOUND')
+    with mock.patch.object(client, 'connect_rabbitmq', side_effect=fake_connect_rabbitmq):
+        helyos_client.publish(helyos_client.status_routing_key, 'message', confirm=True)
+
+    helyos_client.publisher_channel.basic_publish.assert_called_once()
+
+
+def test_keygen_error_is_raised_on_key_access():
+    with mock.patch.object(client, 'generate_private_public_keys', side_effect=RuntimeError('keygen failed')):
+        helyos_client = client.HelyOSClient('localhost', uuid='agent-1')
+        with pytest.raises(RuntimeError, match='keygen failed'):
+            helyos_client.public_key
+
+
+def test_make_publisher_follows_reconnect_and_close(helyos_client):
+    publish_sensors = helyos_client.make_publisher(helyos_client.sensors_routing_key)
+    with mock.patch.object(client, 'connect_rabbitmq', side_effect=fake_connect_rabbitmq):
+        helyos_client.connect('other_user', 'password')
+    publish_sensors('message')
+
+    args, kwargs = helyos_client.pub_channel.basic_publish.call_args
+    assert args[:2] == (client.AGENTS_UL_EXCHANGE, helyos_client.sensors_routing_key)
+    assert kwargs['properties'].user_id == 'other_user'
+    assert kwargs['body'] == b'{"message":"message","signature":null}'
+
+    helyos_client.close_connection()
+    with pytest.raises(HelyOSAccountConnectionError):
+        publish_sensors('message')